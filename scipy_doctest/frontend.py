@@ -62,7 +62,8 @@ def find_doctests(module, strategy=None,
     if config is None:
         config = DTConfig()
 
-    finder = DTFinder(exclude_empty=exclude_empty, config=config)
+    parser = DTParser(config)
+    finder = DTFinder(exclude_empty=exclude_empty, parser=parser, config=config)
 
     if strategy is None:
         tests = finder.find(module, name, globs=globs, extraglobs=extraglobs)
@@ -88,13 +89,13 @@ def find_doctests(module, strategy=None,
         names = [item.__name__ for item in items]
 
     # Having collected the list of objects, extract doctests
+    # NB: modules are not recursed into, only the module docstring is inspected
+    module_finder = DTFinder(recurse=False, parser=parser, config=config)
     tests = []
     for item, name in zip(items, names):
         full_name = module.__name__ + '.' + name
         if inspect.ismodule(item):
-            # do not recurse, only inspect the module docstring
-            _finder = DTFinder(recurse=False, config=config)
-            t = _finder.find(item, name, globs=globs, extraglobs=extraglobs)
+            t = module_finder.find(item, name, globs=globs, extraglobs=extraglobs)
         else:
             t = finder.find(item, full_name, globs=globs, extraglobs=extraglobs)
         tests += t
@@ -20,6 +20,54 @@ else:
 # sequences of Examples without an intervening text.
 SKIPBLOCK = doctest.register_optionflag('SKIPBLOCK')
 
+# The stdlib SKIP flag, looked up once rather than for each docstring
+_SKIP = doctest.OPTIONFLAGS_BY_NAME['SKIP']
+
+
+# Defaults for DTConfig. These are built once at import time; each DTConfig
+# instance gets its own copy, so that users can modify them in-place.
+
+# The namespace to do checks in
+_DEFAULT_CHECK_NAMESPACE = {
+      'np': np,
+      'assert_allclose': np.testing.assert_allclose,
+      'assert_equal': np.testing.assert_equal,
+      # recognize numpy repr's
+      'array': np.array,
+      'matrix': np.matrix,
+      'masked_array': np.ma.masked_array,
+      'int64': np.int64,
+      'uint64': np.uint64,
+      'int8': np.int8,
+      'int32': np.int32,
+      'float32': np.float32,
+      'float64': np.float64,
+      'dtype': np.dtype,
+      'nan': np.nan,
+      'nanj': np.complex128(1j*np.nan),
+      'infj': complex(0, np.inf),
+      'NaN': np.nan,
+      'inf': np.inf,
+      'Inf': np.inf, }
+
+# Additional directives which act like `# doctest: + SKIP`
+_DEFAULT_RNDM_MARKERS = frozenset({'# random', '# Random',
+                                   '#random', '#Random',
+                                   "# may vary"})
+
+# ignore examples which contain any of these stopwords
+_DEFAULT_STOPWORDS = frozenset({'plt.', '.hist', '.show', '.ylim', '.subplot(',
+     'set_title', 'imshow', 'plt.show', '.axis(', '.plot(',
+     '.bar(', '.title', '.ylabel', '.xlabel', 'set_ylim', 'set_xlim',
+     '# reformatted', '.set_xlabel(', '.set_ylabel(', '.set_zlabel(',
+     '.set(xlim=', '.set(ylim=', '.set(xlabel=', '.set(ylabel=', '.xlim(',
+     'ax.set('})
+
+# these names are known to fail doctesting and we like to keep it that way
+_DEFAULT_SKIPLIST = frozenset({'scipy.special.sinc',  # comes from numpy
+                               'scipy.misc.who',  # comes from numpy
+                               'scipy.optimize.show_options', })
+
 
 class DTConfig:
     """A bag class to collect various configuration bits.
@@ -33,7 +81,9 @@ class DTConfig:
     default_namespace : dict
         The namespace to run examples in.
     check_namespace : dict
-        The namespace to do checks in.
+        The namespace to do checks in. A checker copies it on first use:
+        to change it afterwards, assign a new dict rather than modifying
+        it in place.
     rndm_markers : set
         Additional directives which act like `# doctest: + SKIP`.
     atol : float
@@ -132,34 +182,12 @@ class DTConfig:
 
         # The namespace to do checks in
         if check_namespace is None:
-            check_namespace = {
-                  'np': np,
-                  'assert_allclose': np.testing.assert_allclose,
-                  'assert_equal': np.testing.assert_equal,
-                  # recognize numpy repr's
-                  'array': np.array,
-                  'matrix': np.matrix,
-                  'masked_array': np.ma.masked_array,
-                  'int64': np.int64,
-                  'uint64': np.uint64,
-                  'int8': np.int8,
-                  'int32': np.int32,
-                  'float32': np.float32,
-                  'float64': np.float64,
-                  'dtype': np.dtype,
-                  'nan': np.nan,
-                  'nanj': np.complex128(1j*np.nan),
-                  'infj': complex(0, np.inf),
-                  'NaN': np.nan,
-                  'inf': np.inf,
-                  'Inf': np.inf, }
-            self.check_namespace = check_namespace
+            check_namespace = dict(_DEFAULT_CHECK_NAMESPACE)
+        self.check_namespace = check_namespace
 
         # Additional directives which act like `# doctest: + SKIP`
         if rndm_markers is None:
-            rndm_markers = {'# random', '# Random',
-                            '#random', '#Random',
-                            "# may vary"}
+            rndm_markers = set(_DEFAULT_RNDM_MARKERS)
         self.rndm_markers = rndm_markers
 
         self.atol, self.rtol = atol, rtol
@@ -174,12 +202,7 @@ class DTConfig:
         ### DTFinder/DTParser configuration ###
         # ignore examples which contain any of these stopwords
         if stopwords is None:
-            stopwords = {'plt.', '.hist', '.show', '.ylim', '.subplot(',
-                 'set_title', 'imshow', 'plt.show', '.axis(', '.plot(',
-                 '.bar(', '.title', '.ylabel', '.xlabel', 'set_ylim', 'set_xlim',
-                 '# reformatted', '.set_xlabel(', '.set_ylabel(', '.set_zlabel(',
-                 '.set(xlim=', '.set(ylim=', '.set(xlabel=', '.set(ylabel=', '.xlim(',
-                 'ax.set('}
+            stopwords = set(_DEFAULT_STOPWORDS)
         self.stopwords = stopwords
 
         if pseudocode is None:
@@ -189,9 +212,7 @@ class DTConfig:
         # these names are known to fail doctesting and we like to keep it that way
         # e.g. sometimes pseudocode is acceptable etc
         if skiplist is None:
-            skiplist = set(['scipy.special.sinc',  # comes from numpy
-                            'scipy.misc.who',  # comes from numpy
-                            'scipy.optimize.show_options', ])
+            skiplist = set(_DEFAULT_SKIPLIST)
         self.skiplist = skiplist
 
         #### User configuration
@@ -269,6 +290,19 @@ class DTChecker(doctest.OutputChecker):
         self.rndm_markers = set(self.config.rndm_markers)
         self.rndm_markers.add('# _ignore')  # technical, private. See DTParser
 
+        # The namespace to eval `want` and `got` in: a copy of `check_namespace`,
+        # made on first use and redone if `config.check_namespace` is replaced.
+        self._ns_source = None
+        self._eval_ns = None
+
+    def _get_eval_ns(self):
+        ns_source = self.config.check_namespace
+        if ns_source is not self._ns_source:
+            self._eval_ns = dict(ns_source)
+            self._eval_ns.setdefault('__builtins__', __builtins__)
+            self._ns_source = ns_source
+        return self._eval_ns
+
     def check_output(self, want, got, optionflags):
 
         # cut it short if they are equal
@@ -283,6 +317,11 @@ class DTChecker(doctest.OutputChecker):
         if self.obj_pattern.search(got):
             return True
 
+        # no output expected (a common case): nothing else to compare, unless
+        # whitespace is significant
+        if optionflags & NORMALIZE_WHITESPACE and not want.strip():
+            return not got.strip()
+
         # ignore comments (e.g. signal.freqresp)
         if want.lstrip().startswith("#"):
             return True
@@ -295,15 +334,15 @@ class DTChecker(doctest.OutputChecker):
             pass
 
         # OK then, convert strings to objects
-        ns = dict(self.config.check_namespace)
+        ns = self._get_eval_ns()
         try:
             with warnings.catch_warnings():
                 # NumPy's ragged array deprecation of np.array([1, (2, 3)]);
                 # also array abbreviations: try `np.diag(np.arange(1000))`
                 warnings.simplefilter('ignore', VisibleDeprecationWarning)
 
-                a_want = eval(want, dict(ns))
-                a_got = eval(got, dict(ns))
+                a_want = eval(want, ns)
+                a_got = eval(got, ns)
         except Exception:
             # Maybe we're printing a numpy array? This produces invalid python
             # code: `print(np.arange(3))` produces "[0 1 2]" w/o commas between
@@ -395,6 +434,7 @@ class DTRunner(doctest.DocTestRunner):
     def __init__(self, checker=None, verbose=None, optionflags=None, config=None):
         if config is None:
             config = DTConfig()
+        self.config = config
         if checker is None:
             checker = config.CheckerKlass(config)
         self.nameerror_after_exception = config.nameerror_after_exception
@@ -512,16 +552,21 @@ class DTParser(doctest.DocTestParser):
 
         TODO: document the differences between stopwords, pseudocode and +SKIP.
         """
+        if '>>>' not in string:
+            # no examples, nothing to parse
+            return []
+
         stopwords = self.config.stopwords
         pseudocode = self.config.pseudocode
 
-        SKIP = doctest.OPTIONFLAGS_BY_NAME['SKIP']
+        SKIP = _SKIP
+        Example = doctest.Example
         keep_skipping_this_block = False
 
         examples = []
         for example in self.parse(string, name):
             # .parse returns a list of examples and intervening text
-            if not isinstance(example, doctest.Example):
+            if not isinstance(example, Example):
                 if example:
                     keep_skipping_this_block = False
                 continue
@@ -2,6 +2,7 @@
 A pytest plugin that provides enhanced doctesting for Pydata libraries
 """
 import bdb
+import inspect
 import warnings
 import doctest
 
@@ -17,6 +18,10 @@ from .util import np_errstate, matplotlib_make_nongui, temp_cwd
 from .frontend import find_doctests
 
 
+# DoctestModule.collect changed in pytest 8; compare the major version once, as a number
+PYTEST_LT_8 = int(pytest.__version__.split(".")[0]) < 8
+
+
 def pytest_addoption(parser):
     group = parser.getgroup("collect")
 
@@ -38,6 +43,12 @@ def pytest_configure(config):
     # Create a dt config attribute within pytest's config object for easy access.
     config.dt_config = dt_config
 
+    # Command line options do not change during a session: process them once
+    # strategy='api': discover doctests in public, non-deprecated objects in module
+    # strategy=None : use vanilla stdlib doctest discovery
+    strategy = config.getvalue("collection_strategy")
+    config._dt_collection_strategy = None if strategy == 'None' else strategy
+
     # Override doctest's objects with the plugin's alternative implementation.
     pydoctest.DoctestModule = DTModule
     pydoctest.DoctestTextfile = DTTextfile
@@ -50,27 +61,27 @@ def pytest_ignore_collect(collection_path, config):
     the '--doctest-modules' option is used.
     """
     if config.getoption("--doctest-modules"):
-        path_str = str(collection_path)
-        if "tests" in path_str or "test_" in path_str:
+        # NB: look at path components, so that e.g. `/home/contests/foo.py` is not ignored
+        if ("tests" in collection_path.parts or collection_path.stem == "tests" or
+                collection_path.name.startswith("test_")):
             return True
 
-    for entry in config.dt_config.pytest_extra_ignore:
-        if entry in str(collection_path):
-            return True
+    path_str = str(collection_path)
+    if any(entry in path_str for entry in config.dt_config.pytest_extra_ignore):
+        return True
 
 
-def is_private(item):
-    """Decide if an DocTestItem `item` is private.
+def is_private(module):
+    """Decide if a `module` is private.
 
-    Private items are ignored in pytest_collect_modifyitem`.
+    Doctests from private modules are ignored in `DTModule.collect`.
     """
     # Here we look at the name of a test module/object. A seemingly less
     # hacky alternative is to populate a set of seen `item.dtest` attributes
     # (which are actual DocTest objects). The issue with that is it's tricky
     # for explicit skips/ignores. Do we skip linalg.det or linalg._basic.det?
     # (collection order is not guaranteed)
-    parent_full_name = item.parent.module.__name__
-    is_private = "._" in parent_full_name
+    is_private = "._" in module.__name__
     return is_private
 
 
@@ -102,55 +113,13 @@ def pytest_collection_modifyitems(config, items):
     """
     This hook is executed after test collection and allows you to modify the list of collected items.
 
-    The function removes
-        - duplicate Doctest items (e.g., scipy.stats.norm and scipy.stats.distributions.norm)
-        - Doctest items from underscored or otherwise private modules (e.g., scipy.special._precompute)
+    The function adds the skip/xfail markers requested by `DTConfig`.
 
-    Note that this functions cooperates with and cleans up after `DTModule.collect`, which does the
-    bulk of the collection work.
+    Note that duplicate and private Doctest items are filtered out by `DTModule.collect`,
+    which does the bulk of the collection work.
     """
-    # XXX: The logic in this function can probably be folded into DTModule.collect.
-    # I (E.B.) quickly tried it and it does not seem to just work. Apparently something
-    # pytest-y runs in between DTModule.collect and this hook (should that something
-    # be the proper home for all collection?).
-    # Also note that DTTextfile needs _maybe_add_markers, too.
-
-    need_filter_unique = (
-        config.getoption("--doctest-modules") and
-        config.getvalue("collection_strategy") == 'api'
-    )
-
-    unique_items = []
-
     for item in items:
-        if isinstance(item.parent, DTModule) and need_filter_unique:
-            # objects are collected twice: from their public module + from the impl module
-            # e.g. for `levy_stable` we have
-            # (Pdb) p item.name, item.parent.name
-            # ('scipy.stats.levy_stable', 'build-install/lib/python3.10/site-packages/scipy/stats/__init__.py')
-            # and
-            # ('scipy.stats.distributions.levy_stable', 'distributions.py')
-            # so we filter out the second occurence
-            #
-            # There are two options:
-            #  - either the impl module has a leading underscore (scipy.linalg._basic), or
-            #  - it needs to be explicitly listed in the 'extra_ignore' config key (distributions.py)
-            #
-            # Note that the last part cannot be automated: scipy.cluster.vq is public, but
-            # scipy.stats.distributions is not
-            extra_ignore = config.dt_config.pytest_extra_ignore
-            parent_full_name = item.parent.module.__name__
-            is_duplicate = parent_full_name in extra_ignore or item.name in extra_ignore
-
-            if is_duplicate or is_private(item):
-                # ignore it
-                continue
-
         _maybe_add_markers(item, config)
-        unique_items.append(item)
-
-    # Replace the original list of test items with the unique ones
-    items[:] = unique_items
 
 
 def _is_deprecated(module):
@@ -171,6 +140,42 @@ def _is_deprecated(module):
     return res
 
 
+def _has_examples(module):
+    """Detect if a module may contain doctest examples.
+
+    This is a quick check for a `>>>` in the docstrings of the module, of its
+    members and of the members of its classes. It allows skipping the doctest
+    discovery for modules without examples. Note that false positives are
+    harmless, but false negatives are not: when in doubt, return True.
+    """
+    members = vars(module)
+    if "__test__" in members or "__getattr__" in members:
+        # doctests may come from elsewhere
+        return True
+
+    stack, seen = [module], set()
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+
+        try:
+            doc = obj.__doc__
+        except Exception:
+            return True
+        if isinstance(doc, str) and ">>>" in doc:
+            return True
+
+        if obj is module or inspect.isclass(obj):
+            for val in vars(obj).values():
+                if isinstance(val, (staticmethod, classmethod)):
+                    val = val.__func__
+                if not inspect.ismodule(val):
+                    stack.append(val)
+    return False
+
+
 class DTModule(DoctestModule):
     """
     This class extends the DoctestModule class provided by pytest.
@@ -180,11 +185,11 @@ class DTModule(DoctestModule):
     in the specified module or file.
     """
     def collect(self):
-        if pytest.__version__ < '8':
+        if PYTEST_LT_8:
             # Part of this code is copy-pasted from the `_pytest.doctest` module(pytest 7.4.0):
             # https://github.com/pytest-dev/pytest/blob/448563caaac559b8a3195edc58e8806aca8d2c71/src/_pytest/doctest.py#L497
             if self.path.name == "setup.py":
-                return
+                return []
             if self.path.name == "conftest.py":
                 module = self.config.pluginmanager._importconftest(
                     self.path,
@@ -216,9 +221,38 @@ class DTModule(DoctestModule):
                 else:
                     raise
 
+        strategy = self.config._dt_collection_strategy
+
+        # objects are collected twice: from their public module + from the impl module
+        # e.g. for `levy_stable` we have
+        # (Pdb) p item.name, item.parent.name
+        # ('scipy.stats.levy_stable', 'build-install/lib/python3.10/site-packages/scipy/stats/__init__.py')
+        # and
+        # ('scipy.stats.distributions.levy_stable', 'distributions.py')
+        # so we filter out the second occurence
+        #
+        # There are two options:
+        #  - either the impl module has a leading underscore (scipy.linalg._basic), or
+        #  - it needs to be explicitly listed in the 'extra_ignore' config key (distributions.py)
+        #
+        # Note that the last part cannot be automated: scipy.cluster.vq is public, but
+        # scipy.stats.distributions is not
+        # NB: filter here rather than in pytest_collection_modifyitems, to not create
+        # the DoctestItems for duplicates in the first place
+        extra_ignore = frozenset()
+        if strategy == 'api':
+            extra_ignore = frozenset(dt_config.pytest_extra_ignore)
+            if is_private(module) or module.__name__ in extra_ignore:
+                return []
+
         if _is_deprecated(module):
+            return []
+
+        # NB: with strategy='api', `find_doctests` also validates `__all__`: do not
+        # skip it even for modules without examples
+        if strategy is None and not _has_examples(module):
             # bail out early
-            return
+            return []
 
         optionflags = dt_config.optionflags
 
@@ -228,18 +262,12 @@ class DTModule(DoctestModule):
             optionflags=optionflags,
         )
 
-        # strategy='api': discover doctests in public, non-deprecated objects in module
-        # strategy=None : use vanilla stdlib doctest discovery
-        strategy = self.config.getvalue("collection_strategy")
-        if strategy == 'None':
-            strategy = None
-
-        # NB: additional postprocessing in pytest_collection_modifyitems
-        for test in find_doctests(module, strategy=strategy, name=module.__name__, config=dt_config):
-            if test.examples: # skip empty doctests
-                yield pydoctest.DoctestItem.from_parent(
-                    self, name=test.name, runner=runner, dtest=test
-                )
+        make_item = pydoctest.DoctestItem.from_parent
+        return [
+            make_item(self, name=test.name, runner=runner, dtest=test)
+            for test in find_doctests(module, strategy=strategy, name=module.__name__, config=dt_config)
+            if test.examples and test.name not in extra_ignore   # skip empty and ignored doctests
+        ]
 
 
 class DTTextfile(DoctestTextfile):
@@ -255,6 +283,9 @@ class DTTextfile(DoctestTextfile):
         # https://github.com/pytest-dev/pytest/blob/448563caaac559b8a3195edc58e8806aca8d2c71/src/_pytest/doctest.py#L417
         encoding = self.config.getini("doctest_encoding")
         text = self.path.read_text(encoding)
+        if '>>>' not in text:
+            # no examples: skip building the runner and parsing the text
+            return []
         filename = str(self.path)
         name = self.path.name
         globs = {"__name__": "__main__"}
@@ -269,68 +300,96 @@ class DTTextfile(DoctestTextfile):
 
         # Plug in an instance of `DTParser` which parses the doctest examples from the text file and
         # filters out stopwords and pseudocode.
-        parser = DTParser(config=self.config.dt_config)
+        parser = _get_parser(self.config)
 
         # This part of the code is unchanged
         test = parser.get_doctest(text, globs, name, filename, 0)
-        if test.examples:
-            yield pydoctest.DoctestItem.from_parent(
-                self, name=test.name, runner=runner, dtest=test
-            )
+        if not test.examples:
+            return []
+        return [pydoctest.DoctestItem.from_parent(self, name=test.name, runner=runner, dtest=test)]
 
 
-def _get_runner(config, verbose, optionflags):
+def _get_checker(config):
     """
-    Override function to return an instance of PytestDTRunner.
-    
-    This function creates and returns an instance of PytestDTRunner, a custom runner class
-    that extends the behavior of DebugDTRunner for running doctests in pytest.
+    Return a checker instance for the doctests of a collected file.
+
+    NB: do not share a checker across the session: checkers read `dt_config`
+    (tolerances, markers) on creation, and conftest files in subdirectories may
+    modify `dt_config` during collection.
+    """
+    return config.dt_config.CheckerKlass(config.dt_config)
+
+
+def _get_parser(config):
+    """
+    Return the `DTParser` instance shared by all text files of a pytest session.
+    """
+    parser = getattr(config, "_dt_parser", None)
+    if parser is None:
+        parser = DTParser(config=config.dt_config)
+        config._dt_parser = parser
+    return parser
+
+
+class PytestDTRunner(DebugDTRunner):
     """
-    class PytestDTRunner(DebugDTRunner):
-        def run(self, test, compileflags=None, out=None, clear_globs=False):
-            """
-            Run tests in context managers.
-            
-            Restore the errstate/print state after each docstring.
-            Also, make MPL backend non-GUI and close the figures.
-            
-            The order of context managers is actually relevant. Consider
-            user_context_mgr that turns warnings into errors.
-            
-            Additionally, suppose that MPL deprecates something and plt.something
-            starts issuing warnings. Now all of those become errors
-            *unless* the `mpl()` context mgr has a chance to filter them out
-            *before* they become errors in `config.user_context_mgr()`.
-            """
-            dt_config = config.dt_config
-
-            with np_errstate():
-                with dt_config.user_context_mgr(test):
-                    with matplotlib_make_nongui():
-                        # XXX: local_resourses needed? they seem to be, w/o pytest
-                        with temp_cwd(test, dt_config.local_resources):
-                            super().run(test, compileflags=compileflags, out=out, clear_globs=clear_globs)
+    A `DebugDTRunner` to run doctests under pytest.
 
+    The runner of a `DoctestItem`, see `_get_runner`.
+    """
+    def run(self, test, compileflags=None, out=None, clear_globs=False):
         """
-        Almost verbatim copy of `_pytest.doctest.PytestDoctestRunner` except we utilize
-        DTConfig's `nameerror_after_exception` attribute in place of doctest's `continue_on_failure`.
+        Run tests in context managers.
+
+        Restore the errstate/print state after each docstring.
+        Also, make MPL backend non-GUI and close the figures.
+
+        The order of context managers is actually relevant. Consider
+        user_context_mgr that turns warnings into errors.
+
+        Additionally, suppose that MPL deprecates something and plt.something
+        starts issuing warnings. Now all of those become errors
+        *unless* the `mpl()` context mgr has a chance to filter them out
+        *before* they become errors in `config.user_context_mgr()`.
         """
-        def report_failure(self, out, test, example, got):
-            failure = doctest.DocTestFailure(test, example, got)
-            if config.dt_config.nameerror_after_exception:
-                out.append(failure)
-            else:
-                raise failure
-
-        def report_unexpected_exception(self, out, test, example, exc_info):
-            if isinstance(exc_info[1], outcomes.OutcomeException):
-                raise exc_info[1]
-            if isinstance(exc_info[1], bdb.BdbQuit):
-                outcomes.exit("Quitting debugger")
-            failure = doctest.UnexpectedException(test, example, exc_info)
-            if config.dt_config.nameerror_after_exception:
-                out.append(failure)
-            else:
-                raise failure
+        dt_config = self.config
 
-    return PytestDTRunner(verbose=verbose, optionflags=optionflags, config=config.dt_config)
+        with np_errstate():
+            with dt_config.user_context_mgr(test):
+                with matplotlib_make_nongui():
+                    # XXX: local_resourses needed? they seem to be, w/o pytest
+                    with temp_cwd(test, dt_config.local_resources):
+                        super().run(test, compileflags=compileflags, out=out, clear_globs=clear_globs)
+
+    """
+    Almost verbatim copy of `_pytest.doctest.PytestDoctestRunner` except we utilize
+    DTConfig's `nameerror_after_exception` attribute in place of doctest's `continue_on_failure`.
+    """
+    def report_failure(self, out, test, example, got):
+        failure = doctest.DocTestFailure(test, example, got)
+        if self.nameerror_after_exception:
+            out.append(failure)
+        else:
+            raise failure
+
+    def report_unexpected_exception(self, out, test, example, exc_info):
+        if isinstance(exc_info[1], outcomes.OutcomeException):
+            raise exc_info[1]
+        if isinstance(exc_info[1], bdb.BdbQuit):
+            outcomes.exit("Quitting debugger")
+        failure = doctest.UnexpectedException(test, example, exc_info)
+        if self.nameerror_after_exception:
+            out.append(failure)
+        else:
+            raise failure
+
+
+def _get_runner(config, verbose, optionflags):
+    """
+    Override function to return an instance of PytestDTRunner.
+
+    PytestDTRunner is a custom runner class that extends the behavior of
+    DebugDTRunner for running doctests in pytest.
+    """
+    return PytestDTRunner(checker=_get_checker(config),
+                          verbose=verbose, optionflags=optionflags, config=config.dt_config)
@@ -1,3 +1,5 @@
+import types
+
 import pytest
 
 try:
@@ -12,9 +14,8 @@ try:
 except Exception:
     HAVE_SCIPY = False
 
-from pathlib import Path
-
 from . import module_cases, failure_cases, failure_cases_2, stopwords_cases, local_file_cases
+from ..plugin import _has_examples
 
 # XXX: this is a bit hacky and repetetive. Can rework?
 
@@ -25,27 +26,20 @@ pytest_plugins = ['pytester']
 @pytest.mark.skipif(not HAVE_SCIPY, reason='need scipy')
 def test_module_cases(pytester):
     """Test that pytest uses the DTChecker for doctests."""
-    path_str = module_cases.__file__
-    python_file = Path(path_str)
-    result = pytester.inline_run(python_file, "--doctest-modules")
+    result = pytester.inline_run(module_cases.__file__, "--doctest-modules")
     assert result.ret == pytest.ExitCode.OK
 
 
-def test_failure_cases(pytester):
-    file_list = [failure_cases, failure_cases_2]
-    for file in file_list:
-        path_str = file.__file__
-        python_file = Path(path_str)
-        result = pytester.inline_run(python_file, "--doctest-modules")
+@pytest.mark.parametrize("module", [failure_cases, failure_cases_2])
+def test_failure_cases(pytester, module):
+    result = pytester.inline_run(module.__file__, "--doctest-modules")
     assert result.ret == pytest.ExitCode.TESTS_FAILED
 
     
 @pytest.mark.skipif(not HAVE_MATPLOTLIB, reason='need matplotlib')
 def test_stopword_cases(pytester):
     """Test that pytest uses the DTParser for doctests."""
-    path_str = stopwords_cases.__file__
-    python_file = Path(path_str)
-    result = pytester.inline_run(python_file, "--doctest-modules")
+    result = pytester.inline_run(stopwords_cases.__file__, "--doctest-modules")
     assert result.ret == pytest.ExitCode.OK
 
 
@@ -54,9 +48,7 @@ def test_stopword_cases(pytester):
 def test_local_file_cases(pytester):
     """Test that local files are found for use in doctests.
     """
-    path_str = local_file_cases.__file__
-    python_file = Path(path_str)
-    result = pytester.inline_run(python_file, "--doctest-modules")
+    result = pytester.inline_run(local_file_cases.__file__, "--doctest-modules")
     assert result.ret == pytest.ExitCode.OK
 
 
@@ -93,3 +85,189 @@ def test_alt_checker(pytester):
     result = pytester.inline_run(f, '--doctest-modules')
     assert result.ret == pytest.ExitCode.TESTS_FAILED
 
+
+def test_nested_conftest(pytester, monkeypatch):
+    """dt_config changes from a conftest in a subdirectory apply to files collected
+    after the conftest is loaded."""
+    from scipy_doctest import DTChecker
+    from scipy_doctest.conftest import dt_config
+    monkeypatch.setattr(dt_config, "atol", dt_config.atol)  # undo the conftest change
+    monkeypatch.setattr(dt_config, "CheckerKlass", DTChecker)
+
+    src = (
+        "def func():\n"
+        "    '''\n"
+        "    >>> 1.0\n"
+        "    1.05\n"
+        "    '''\n"
+    )
+    pytester.makepyfile(a=src)
+    sub = pytester.mkdir("sub")
+    (sub / "b.py").write_text(src)
+    (sub / "conftest.py").write_text(
+        "from scipy_doctest.conftest import dt_config\n"
+        "dt_config.atol = 0.1\n"
+    )
+
+    result = pytester.inline_run("--doctest-modules")
+    # NB: whether `a.py` sees the change depends on the collection order
+    # (pytest < 8 loads `sub/conftest.py` before collecting `a.py`)
+    passed, _, _ = result.listoutcomes()
+    assert "sub/b.py::b.func" in [item.nodeid for item in passed]
+
+
+def test_private_module_duplicates(pytester):
+    """With the 'api' strategy, private modules do not contribute doctests."""
+    pkg = pytester.mkpydir("pkg")
+    (pkg / "_impl.py").write_text(
+        "__all__ = ['func']\n\n"
+        "def func():\n"
+        "    '''\n"
+        "    >>> 1 + 1\n"
+        "    2\n"
+        "    '''\n"
+    )
+    (pkg / "__init__.py").write_text(
+        "from ._impl import func\n"
+        "__all__ = ['func']\n"
+    )
+
+    result = pytester.inline_run(pkg, "--doctest-modules", "--doctest-collect=api")
+    assert result.ret == pytest.ExitCode.OK
+    passed, _, _ = result.listoutcomes()
+    assert [item.nodeid for item in passed] == ["pkg/__init__.py::pkg.func"]
+
+
+def test_extra_ignore_names(pytester, monkeypatch):
+    """With the 'api' strategy, doctests listed in `pytest_extra_ignore` are dropped."""
+    from scipy_doctest.conftest import dt_config
+    monkeypatch.setattr(dt_config, "pytest_extra_ignore", ["pkg.func2"])
+
+    pkg = pytester.mkpydir("pkg")
+    (pkg / "__init__.py").write_text(
+        "__all__ = ['func', 'func2']\n\n"
+        "def func():\n"
+        "    '''\n"
+        "    >>> 1 + 1\n"
+        "    2\n"
+        "    '''\n\n"
+        "def func2():\n"
+        "    '''\n"
+        "    >>> 1 + 1\n"
+        "    2\n"
+        "    '''\n"
+    )
+
+    result = pytester.inline_run(pkg, "--doctest-modules", "--doctest-collect=api")
+    assert result.ret == pytest.ExitCode.OK
+    passed, _, _ = result.listoutcomes()
+    assert [item.nodeid for item in passed] == ["pkg/__init__.py::pkg.func"]
+
+
+def test_ignore_tests_module(pytester):
+    """Test modules named `tests.py` are not collected with --doctest-modules."""
+    pkg = pytester.mkpydir("pkg")
+    src = (
+        "def func():\n"
+        "    '''\n"
+        "    >>> 1 + 1\n"
+        "    2\n"
+        "    '''\n"
+    )
+    (pkg / "tests.py").write_text(src)
+    (pkg / "contests.py").write_text(src)
+
+    result = pytester.inline_run(pkg, "--doctest-modules")
+    assert result.ret == pytest.ExitCode.OK
+    passed, _, _ = result.listoutcomes()
+    assert [item.nodeid for item in passed] == ["pkg/contests.py::pkg.contests.func"]
+
+
+def test_api_broken_all(pytester):
+    """With the 'api' strategy, a missing `__all__` item is an error even without examples."""
+    pkg = pytester.mkpydir("pkg")
+    (pkg / "__init__.py").write_text(
+        "__all__ = ['missing', 'f']\n\n"
+        "def f():\n"
+        "    pass\n"
+    )
+
+    result = pytester.inline_run(pkg, "--doctest-modules", "--doctest-collect=api")
+    assert result.ret == pytest.ExitCode.INTERRUPTED   # collection error
+    _, _, failed = result.listoutcomes()
+    assert len(failed) == 1
+    assert "Missing item" in str(failed[0].longrepr)
+
+
+class TestHasExamples:
+    """Test the prefilter which skips doctest discovery for modules without examples."""
+
+    @staticmethod
+    def make_module(src):
+        module = types.ModuleType("mod")
+        exec(src, vars(module))
+        return module
+
+    def test_no_examples(self):
+        module = self.make_module(
+            '"""A module docstring."""\n'
+            "def f():\n"
+            "    '''No examples.'''\n"
+            "class C:\n"
+            "    def meth(self):\n"
+            "        '''No examples either.'''\n"
+        )
+        assert not _has_examples(module)
+
+    def test_module_docstring(self):
+        module = self.make_module('""">>> 1 + 1\n2\n"""\n')
+        assert _has_examples(module)
+
+    def test_function(self):
+        module = self.make_module("def f():\n    '''>>> 1'''\n")
+        assert _has_examples(module)
+
+    def test_class_and_members(self):
+        module = self.make_module("class C:\n    '''>>> 1'''\n")
+        assert _has_examples(module)
+
+        module = self.make_module(
+            "class C:\n"
+            "    def meth(self):\n"
+            "        '''>>> 1'''\n"
+        )
+        assert _has_examples(module)
+
+    @pytest.mark.parametrize("decorator", ["staticmethod", "classmethod"])
+    def test_static_and_class_methods(self, decorator):
+        module = self.make_module(
+            "class C:\n"
+            f"    @{decorator}\n"
+            "    def meth(*args):\n"
+            "        '''>>> 1'''\n"
+        )
+        assert _has_examples(module)
+
+    def test_nested_class(self):
+        module = self.make_module(
+            "class C:\n"
+            "    class D:\n"
+            "        def meth(self):\n"
+            "            '''>>> 1'''\n"
+        )
+        assert _has_examples(module)
+
+    def test_test_dict(self):
+        # `__test__` may hold doctests as plain strings
+        module = self.make_module("__test__ = {'a': 'no prompt here'}\n")
+        assert _has_examples(module)
+
+    def test_module_getattr(self):
+        # a module-level `__getattr__` may provide objects lazily
+        module = self.make_module("def __getattr__(name):\n    raise AttributeError(name)\n")
+        assert _has_examples(module)
+
+    def test_submodules_not_recursed(self):
+        # a module-level `import` does not make its examples ours
+        module = self.make_module("import doctest\n")
+        assert not _has_examples(module)
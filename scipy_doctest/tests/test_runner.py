@@ -103,3 +103,9 @@ class TestCheckerDropIn:
             for t in tests:
                 runner.run(t)
 
+
+def test_runner_keeps_config():
+    # the runner uses the config it was given, not a copy
+    config = DTConfig()
+    runner = DTRunner(config=config)
+    assert runner.config is config
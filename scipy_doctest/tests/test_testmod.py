@@ -117,6 +117,48 @@ def test_tuple_and_list():
     assert res.failed == 2
 
 
+def test_config_defaults_not_shared():
+    # in-place modifications of one config do not leak into another one
+    config = DTConfig()
+    config.stopwords.add('foo(')
+    config.check_namespace['foo'] = None
+    other = DTConfig()
+    assert 'foo(' not in other.stopwords
+    assert 'foo' not in other.check_namespace
+
+
+def test_user_check_namespace():
+    # a user-provided check_namespace is what `want` and `got` are eval-ed in
+    config = DTConfig(check_namespace={'array': np.array, 'nan': np.nan})
+    checker = config.CheckerKlass(config)
+    assert checker.check_output('array([1., nan])', 'array([1., nan])\n', 0)
+    assert checker.check_output('array([1., 2.])', 'array([1., 2.00001])', 0)
+    assert not checker.check_output('array([1., 2.])', 'array([1., 3.])', 0)
+
+
+def test_check_namespace_replaced():
+    # replacing `check_namespace` after the first check is picked up
+    config = DTConfig()
+    checker = config.CheckerKlass(config)
+    assert checker.check_output('array([1., 2.])', 'array([1., 2.00001])', 0)
+    assert not checker.check_output('one', '1', 0)
+
+    config.check_namespace = {**config.check_namespace, 'one': 1}
+    assert checker.check_output('one', '1', 0)
+
+
+def test_empty_want():
+    config = DTConfig()
+    checker = config.CheckerKlass(config)
+    assert checker.check_output('', '\n', doctest.NORMALIZE_WHITESPACE)
+    assert checker.check_output('\n', '', doctest.NORMALIZE_WHITESPACE)
+    assert not checker.check_output('', 'None\n', doctest.NORMALIZE_WHITESPACE)
+
+    # without NORMALIZE_WHITESPACE, whitespace-only output must match exactly
+    assert not checker.check_output('', '\n', 0)
+    assert not checker.check_output('\n', '', 0)
+
+
 class TestLocalFiles:
     def test_local_files(self):
         # A doctest tries to open a local file. Test that it works
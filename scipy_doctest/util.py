@@ -2,27 +2,45 @@
 Assorted utilities.
 """
 import os
+import atexit
 import warnings
 import operator
 import shutil
 import copy
 import tempfile
 import inspect
+import functools
 from contextlib import contextmanager
 
 
+@functools.lru_cache(maxsize=None)
+def _have_matplotlib():
+    """Check if matplotlib is installed.
+
+    Python does not cache failed imports, so without matplotlib
+    a bare `import matplotlib` would search the path again for each docstring.
+    """
+    try:
+        import matplotlib    # noqa
+        return True
+    except ImportError:
+        return False
+
+
 @contextmanager
 def matplotlib_make_nongui():
     """ Temporarily make the matplotlib backend non-GUI; close all figures on exit.
     """
-    try:
-        import matplotlib
-        import matplotlib.pyplot as plt
-        backend = matplotlib.get_backend()
-        plt.close('all')
-        matplotlib.use('Agg')
-    except ImportError:
-        backend = None
+    backend = None
+    if _have_matplotlib():
+        try:
+            import matplotlib
+            import matplotlib.pyplot as plt
+            backend = matplotlib.get_backend()
+            plt.close('all')
+            matplotlib.use('Agg')
+        except ImportError:
+            backend = None
 
     try:
         # Matplotlib issues UserWarnings on plt.show() with a non-GUI backend,
@@ -60,9 +78,11 @@ def temp_cwd(test, local_resources=None):
 
     if local_resources and test.name in local_resources:
         # local files requested; copy the files
+        # NB: copy the contents only, permission bits are irrelevant for a scratch copy
         path, _ = os.path.split(test.filename)
         for fname in local_resources[test.name]:
-            shutil.copy(os.path.join(path, fname), tmpdir)
+            shutil.copyfile(os.path.join(path, fname),
+                            os.path.join(tmpdir, os.path.basename(fname)))
     try:
         os.chdir(tmpdir)
         yield tmpdir
@@ -256,24 +276,36 @@ def get_public_objects(module, skiplist=None):
 
 
 # XXX: not used ATM
-modules = []
+modules = set()
+_logfile = None
+
+
+def _get_logfile():
+    """Open 'doctest.log' on first use, and close it at interpreter exit."""
+    global _logfile
+    if _logfile is None:
+        _logfile = open('doctest.log', 'a', buffering=64*1024)
+        atexit.register(_logfile.close)
+    return _logfile
+
+
 def generate_log(module, test):
     """
     Generate a log of the doctested items.
     
     This function logs the items being doctested to a file named 'doctest.log'.
+    The file is opened once and is written through a buffer.
     
     Args:
         module (module): The module being doctested.
         test (str): The name of the doctest item.
     """
-    with open('doctest.log', 'a') as LOGFILE:
-        try:
-            if module.__name__ not in modules:
-                LOGFILE.write("\n" + module.__name__ + "\n")
-                LOGFILE.write("="*len(module.__name__) + "\n")
-                modules.append(module.__name__)
-            LOGFILE.write(f"{test}\n")
-        except AttributeError:
-            LOGFILE.write(f"{test}\n")
-
+    LOGFILE = _get_logfile()
+    try:
+        if module.__name__ not in modules:
+            LOGFILE.write("\n" + module.__name__ + "\n")
+            LOGFILE.write("="*len(module.__name__) + "\n")
+            modules.add(module.__name__)
+        LOGFILE.write(f"{test}\n")
+    except AttributeError:
+        LOGFILE.write(f"{test}\n")